@@ -1,9 +1,14 @@
+import atexit
+import functools
 import shutil
 import subprocess
+import threading
+import select
+import time
 import os
 import platform
 import logging
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,17 +16,79 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("openscad_runner")
 
+_PLATFORM = platform.system()
+
+# Discovery results don't change during a server run, so they are computed
+# once and shared by every OpenSCADRunner instance.
+_UNSET = object()
+_EXECUTABLE_CACHE = _UNSET
+_LIB_PATHS_CACHE = _UNSET
+
+# Upper bound on memoized library path resolutions (hits and misses).
+_RESOLVE_CACHE_SIZE = 1024
+
+# Concurrent xvfb-run calls start their free-display search this far apart, so
+# parallel renders don't race for the same /tmp/.X*-lock.
+_XVFB_BASE_SERVER_NUM = 99
+_XVFB_SERVER_NUM_STRIDE = 10
+
+# Seconds to wait for a persistent Xvfb to report its display before falling back to xvfb-run
+_XVFB_START_TIMEOUT = 5
+
 class OpenSCADRunner:
     def __init__(self, executable_path: Optional[str] = None):
         self.executable = executable_path or self.find_executable()
         if not self.executable:
             logger.warning("OpenSCAD executable not found. Make sure it is installed and in PATH or set in .env.")
 
+        self.enable_args = self.get_enable_args()
+
         self.library_paths = self.get_library_paths()
+        # Normalized once so is_path_safe is a plain string comparison
+        lib_paths_norm = [os.path.normcase(os.path.abspath(p)) for p in self.library_paths]
+        self._lib_paths_set = frozenset(lib_paths_norm)
+        self._lib_prefixes = tuple(os.path.join(p, "") for p in lib_paths_norm)
+
+        # Per-instance LRU over resolve results; None (not found) is cached too.
+        self._resolve_cached = functools.lru_cache(maxsize=_RESOLVE_CACHE_SIZE)(self._resolve_uncached)
+
+        # Output of `openscad --help`, loaded on first supports_option() call
+        self._help_text = None
+
+        # Persistent headless display (opt-in via OPENSCAD_DAEMON=1)
+        self._xvfb_process = None
+        self._display = None
+        self._daemon_lock = threading.Lock()
+        self._xvfb_missing = False
+
+        # xvfb-run slots in use by concurrent run() calls
+        self._xvfb_slots = set()
+        self._xvfb_slots_lock = threading.Lock()
+
+        if os.getenv("OPENSCAD_DAEMON") == "1":
+            self.start_daemon()
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """
+        Clears the cached executable and library path discovery results.
+        """
+        global _EXECUTABLE_CACHE, _LIB_PATHS_CACHE
+        _EXECUTABLE_CACHE = _UNSET
+        _LIB_PATHS_CACHE = _UNSET
 
     def find_executable(self) -> Optional[str]:
         """
         Attempts to locate the OpenSCAD executable.
+        The result is cached after the first lookup.
+        """
+        global _EXECUTABLE_CACHE
+        if _EXECUTABLE_CACHE is _UNSET:
+            _EXECUTABLE_CACHE = self._discover_executable()
+        return _EXECUTABLE_CACHE
+
+    def _discover_executable(self) -> Optional[str]:
+        """
         Checks env var, PATH and common installation directories.
         """
         # Check environment variable first
@@ -35,7 +102,7 @@ class OpenSCADRunner:
             return path_executable
 
         # Check common Windows paths
-        if platform.system() == "Windows":
+        if _PLATFORM == "Windows":
             common_paths = [
                 r"C:\Program Files\OpenSCAD\openscad.exe",
                 r"C:\Program Files (x86)\OpenSCAD\openscad.exe",
@@ -46,7 +113,7 @@ class OpenSCADRunner:
                     return path
 
         # Check common Linux paths
-        if platform.system() == "Linux":
+        if _PLATFORM == "Linux":
              common_paths = [
                  "/usr/bin/openscad",
                  "/usr/local/bin/openscad",
@@ -58,37 +125,216 @@ class OpenSCADRunner:
 
         return None
 
-    def run(self, args: list[str]) -> Tuple[bool, str, str]:
+    def start_daemon(self) -> bool:
+        """
+        Starts a persistent Xvfb display shared by all renders (Linux only).
+        OpenSCAD has no server mode, but this removes the X server startup that
+        xvfb-run otherwise pays on every render.
+        Returns True if the display is running.
+        """
+        with self._daemon_lock:
+            return self._start_daemon_locked()
+
+    def _start_daemon_locked(self) -> bool:
+        if self._display and self._xvfb_process and self._xvfb_process.poll() is None:
+            return True
+
+        if _PLATFORM != "Linux" or self._xvfb_missing:
+            return False
+
+        xvfb_path = shutil.which("Xvfb")
+        if not xvfb_path:
+            self._xvfb_missing = True
+            logger.warning("Xvfb was not found. Falling back to xvfb-run per render.")
+            return False
+
+        read_fd = write_fd = None
+        process = None
+        display_number = ""
+        try:
+            # -displayfd makes Xvfb pick a free display number and write it to the pipe
+            read_fd, write_fd = os.pipe()
+            process = subprocess.Popen(
+                [xvfb_path, "-displayfd", str(write_fd), "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                pass_fds=(write_fd,),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            # Only Xvfb holds the write end now, so the pipe reports EOF if it exits
+            os.close(write_fd)
+            write_fd = None
+            display_number = self._read_display_number(read_fd, _XVFB_START_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to start Xvfb daemon: {e}")
+        finally:
+            for fd in (read_fd, write_fd):
+                if fd is not None:
+                    os.close(fd)
+
+        if not display_number:
+            if process and process.poll() is None:
+                process.kill()
+                process.wait()
+            logger.warning("Xvfb daemon did not report a display. Falling back to xvfb-run per render.")
+            return False
+
+        self._xvfb_process = process
+        self._display = f":{display_number}"
+        atexit.register(self.stop_daemon)
+        logger.info(f"Started Xvfb daemon on display {self._display}")
+        return True
+
+    @staticmethod
+    def _read_display_number(read_fd: int, timeout: float) -> str:
+        """
+        Waits up to timeout seconds for Xvfb to write its display number.
+        Returns "" if Xvfb exits or stays silent.
+        """
+        deadline = time.monotonic() + timeout
+        data = b""
+        while b"\n" not in data:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return ""
+            ready, _, _ = select.select([read_fd], [], [], remaining)
+            if not ready:
+                return ""
+            chunk = os.read(read_fd, 64)
+            if not chunk:
+                return ""
+            data += chunk
+        return data.decode(errors="replace").strip()
+
+    def stop_daemon(self) -> None:
+        """
+        Stops the persistent Xvfb display if one was started.
+        """
+        if self._xvfb_process and self._xvfb_process.poll() is None:
+            self._xvfb_process.terminate()
+        self._xvfb_process = None
+        self._display = None
+
+    def supports_option(self, option: str) -> bool:
+        """
+        Checks whether the installed OpenSCAD lists the given command line option
+        (e.g. "--summary") in its --help output. The help text is read once.
+        """
+        if not self.executable:
+            return False
+
+        if self._help_text is None:
+            try:
+                result = subprocess.run(
+                    [self.executable, "--help"],
+                    capture_output=True,
+                    text=True,
+                    check=False
+                )
+                # OpenSCAD prints its usage to stderr
+                self._help_text = result.stdout + result.stderr
+            except Exception as e:
+                logger.warning(f"Could not query OpenSCAD options: {e}")
+                self._help_text = ""
+
+        return option in self._help_text
+
+    def get_enable_args(self) -> list[str]:
+        """
+        Returns --enable arguments for the experimental features listed in
+        OPENSCAD_ENABLE_FEATURES (comma separated, e.g. "fast-csg,lazy-union").
+        """
+        features = os.getenv("OPENSCAD_ENABLE_FEATURES", "")
+        return [f"--enable={feature.strip()}" for feature in features.split(",") if feature.strip()]
+
+    def run(self, args: list[str], stdout_binary: bool = False) -> Tuple[bool, Union[str, bytes], str]:
         """
         Runs OpenSCAD with the given arguments.
+        Configured --enable feature flags are prepended once per invocation.
+        If stdout_binary is True, stdout is returned as raw bytes (e.g. for "-o -" exports).
         Returns (success, stdout, stderr).
         """
+        empty_stdout = b"" if stdout_binary else ""
         if not self.executable:
-            return False, "", "OpenSCAD executable not found."
+            return False, empty_stdout, "OpenSCAD executable not found."
 
-        command = [self.executable] + args
+        command = [self.executable] + self.enable_args + args
+        env = None
 
-        # On Linux, try to use xvfb-run if available to support headless rendering
-        if platform.system() == "Linux":
+        # Read both once; stop_daemon() may reset them from another thread
+        process, display = self._xvfb_process, self._display
+        if display and process and process.poll() is None:
+            # Render on the persistent display started by start_daemon()
+            env = dict(os.environ, DISPLAY=display)
+        elif _PLATFORM == "Linux":
+            # On Linux, try to use xvfb-run if available to support headless rendering
             xvfb_path = shutil.which("xvfb-run")
             if xvfb_path:
-                command = [xvfb_path, "-a"] + command
+                slot = self._acquire_xvfb_slot()
+                server_num = _XVFB_BASE_SERVER_NUM + slot * _XVFB_SERVER_NUM_STRIDE
+                command = [xvfb_path, "-a", "-n", str(server_num)] + command
+                try:
+                    return self._run_command(command, env, stdout_binary)
+                finally:
+                    self._release_xvfb_slot(slot)
 
+        return self._run_command(command, env, stdout_binary)
+
+    def _acquire_xvfb_slot(self) -> int:
+        """
+        Reserves the lowest xvfb-run slot not used by another in-flight render.
+        """
+        with self._xvfb_slots_lock:
+            slot = 0
+            while slot in self._xvfb_slots:
+                slot += 1
+            self._xvfb_slots.add(slot)
+            return slot
+
+    def _release_xvfb_slot(self, slot: int) -> None:
+        with self._xvfb_slots_lock:
+            self._xvfb_slots.discard(slot)
+
+    def _run_command(self, command: list[str], env: Optional[dict], stdout_binary: bool) -> Tuple[bool, Union[str, bytes], str]:
+        """
+        Executes a prepared command line and collects its output.
+        """
+        empty_stdout = b"" if stdout_binary else ""
         try:
+            if stdout_binary:
+                result = subprocess.run(
+                    command,
+                    capture_output=True,
+                    check=False,
+                    env=env
+                )
+                stderr = result.stderr.decode(errors="replace")
+                return result.returncode == 0, result.stdout, stderr
+
             result = subprocess.run(
                 command,
                 capture_output=True,
                 text=True,
-                check=False
+                check=False,
+                env=env
             )
             return result.returncode == 0, result.stdout, result.stderr
         except Exception as e:
-            return False, "", str(e)
+            return False, empty_stdout, str(e)
 
     def get_library_paths(self) -> list[str]:
         """
         Returns a list of allowed library paths.
         Prioritizes .env, then standard system paths.
+        The result is cached after the first lookup.
+        """
+        global _LIB_PATHS_CACHE
+        if _LIB_PATHS_CACHE is _UNSET:
+            _LIB_PATHS_CACHE = self._discover_library_paths()
+        return list(_LIB_PATHS_CACHE)
+
+    def _discover_library_paths(self) -> list[str]:
+        """
+        Collects existing library directories from .env and standard system paths.
         """
         paths = []
 
@@ -101,22 +347,33 @@ class OpenSCADRunner:
                 paths.append(os.path.abspath(env_lib_path))
 
         # Standard system paths
-        if platform.system() == "Windows":
+        if _PLATFORM == "Windows":
              paths.append(os.path.abspath(os.path.expanduser(r"~\Documents\OpenSCAD\libraries")))
-        elif platform.system() == "Linux":
+        elif _PLATFORM == "Linux":
              paths.append(os.path.abspath(os.path.expanduser("~/.local/share/OpenSCAD/libraries")))
              paths.append(os.path.abspath("/usr/share/openscad/libraries"))
-        elif platform.system() == "Darwin": # macOS
+        elif _PLATFORM == "Darwin": # macOS
              paths.append(os.path.abspath(os.path.expanduser("~/Documents/OpenSCAD/libraries")))
 
-        # Filter existing paths and remove duplicates
-        return list(set([p for p in paths if os.path.exists(p)]))
+        # Filter existing paths and remove duplicates, keeping priority order (.env first)
+        return list(dict.fromkeys(p for p in paths if os.path.exists(p)))
+
+    def invalidate_library_cache(self) -> None:
+        """
+        Clears memoized library path resolutions.
+        Call this after creating or removing files that may live in a library directory.
+        """
+        self._resolve_cached.cache_clear()
 
     def resolve_library_path(self, path: str) -> Optional[str]:
         """
         Resolves a relative path to an absolute path within one of the allowed library directories.
         Returns the absolute path if found and safe, otherwise None.
+        Results (including misses) are cached, see invalidate_library_cache().
         """
+        return self._resolve_cached(path)
+
+    def _resolve_uncached(self, path: str) -> Optional[str]:
         # If absolute, check safety directly
         if os.path.isabs(path):
             return path if self.is_path_safe(path) else None
@@ -137,18 +394,16 @@ class OpenSCADRunner:
         Checks if the target_path is within one of the allowed library directories.
         """
         try:
-            target_path = os.path.abspath(target_path)
-            for lib_path in self.library_paths:
-                # We use os.path.commonpath to safely check if target_path is inside lib_path
-                # This prevents directory traversal attacks like ../../../
-                if os.path.commonpath([lib_path, target_path]) == lib_path:
-                    return True
+            # abspath collapses "..", which prevents directory traversal attacks like ../../../
+            target_path = os.path.normcase(os.path.abspath(target_path))
+            if target_path in self._lib_paths_set:
+                return True
+            # Prefixes end with a separator, so "/libs" doesn't match "/libs-other"
+            return target_path.startswith(self._lib_prefixes)
         except Exception as e:
             logger.error(f"Path safety check error: {e}")
             return False
 
-        return False
-
 if __name__ == "__main__":
     runner = OpenSCADRunner()
     print(f"Executable: {runner.executable}")
@@ -1,11 +1,21 @@
 from mcp.server.fastmcp import FastMCP, Image
 import os
+import io
+import shutil
+import time
+import atexit
 import logging
 from openscad_runner import OpenSCADRunner
+import PIL
 from PIL import Image as PILImage, ImageDraw, ImageFont
 from typing import Optional, Tuple
 import tempfile
-import math
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from stl import mesh
 import numpy as np
 
@@ -13,55 +23,295 @@ import numpy as np
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mcp_server")
 
+# Pillow-SIMD releases carry a ".postN" version suffix
+logger.info(f"Using Pillow {PIL.__version__}" + (" (SIMD build)" if ".post" in PIL.__version__ else ""))
+
 # Initialize MCP Server
 mcp = FastMCP("OpenSCAD Server")
 
 # Initialize OpenSCAD Runner
 runner = OpenSCADRunner()
 
-def calculate_camera_parameters(scad_filename: str) -> Tuple[float, float, float, float]:
+# Shared pool for concurrent OpenSCAD renders (each render is a subprocess,
+# so threads are enough). Kept alive for the whole server run.
+_RENDER_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
+
+# RAM-backed location for intermediate render files on Linux; None means the default temp dir
+_FAST_TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Working directory scripts are saved into, normalized once for the containment check
+_CWD = os.path.normcase(os.path.abspath(os.getcwd()))
+_CWD_PREFIX = os.path.join(_CWD, "")
+
+# Extensions listed as [FILE] when browsing library directories
+_SCAD_EXTS = (".scad", ".inc")
+
+# Recent render_preview results: content hash -> (png bytes, OpenSCAD logs)
+_RENDER_CACHE_SIZE = 32
+_RENDER_CACHE: "OrderedDict[bytes, Tuple[bytes, str]]" = OrderedDict()
+_RENDER_CACHE_LOCK = threading.Lock()
+
+def _render_cache_key(scad_filename: str, args: list[str]) -> bytes:
     """
-    Calculates the center of the model and an optimal camera distance
-    by exporting to STL and analyzing the bounding box.
-    Returns (center_x, center_y, center_z, distance).
+    Hashes the script source together with the OpenSCAD arguments.
+    """
+    with open(scad_filename, "rb") as f:
+        source = f.read()
+    return hashlib.blake2b(source + "\0".join(args).encode(), digest_size=16).digest()
+
+def invalidate_render_cache() -> None:
+    """
+    Drops all cached previews. Scripts can include each other, so any write
+    may change the output of an otherwise unchanged file.
+    """
+    with _RENDER_CACHE_LOCK:
+        _RENDER_CACHE.clear()
+
+# STLs exported for camera calculation, kept so export_stl can reuse them.
+# Each server process gets its own directory, removed at exit: an include<>d file
+# edited between runs doesn't change the includer's mtime, so entries must not outlive the process.
+# Files are named <sha1(abs path, OpenSCAD binary, --enable flags)>-<mtime_ns>.stl
+# with a .log sidecar holding OpenSCAD's output.
+_STL_CACHE_ROOT = os.path.join(os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "openscad-mcp")
+_STL_CACHE_DIR = os.path.join(_STL_CACHE_ROOT, f"run-{os.getpid()}")
+_STL_CACHE_SIZE = 16
+# Directories of crashed runs older than this (seconds) are removed at startup
+_STL_CACHE_STALE_AGE = 24 * 60 * 60
+
+def _stl_cache_path(scad_filename: str) -> Optional[str]:
+    """
+    Returns the cache location for the current version of scad_filename
+    as exported by the current OpenSCAD binary and flags,
+    or None if the file can't be stat'ed.
+    """
+    try:
+        mtime_ns = os.stat(scad_filename).st_mtime_ns
+        exe_mtime_ns = os.stat(runner.executable).st_mtime_ns if runner.executable else 0
+    except OSError:
+        return None
+    key = "\0".join([
+        os.path.abspath(scad_filename),
+        runner.executable or "",
+        str(exe_mtime_ns),
+        "\0".join(runner.enable_args)
+    ])
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.join(_STL_CACHE_DIR, f"{digest}-{mtime_ns}.stl")
+
+def _remove_stl_cache_dir() -> None:
+    """
+    Deletes this process's STL cache directory.
+    """
+    shutil.rmtree(_STL_CACHE_DIR, ignore_errors=True)
+
+def _cleanup_stale_stl_caches() -> None:
+    """
+    Removes cache directories left behind by runs that didn't exit cleanly,
+    including a leftover directory with this process's pid.
+    """
+    _remove_stl_cache_dir()
+    cutoff = time.time() - _STL_CACHE_STALE_AGE
+    try:
+        with os.scandir(_STL_CACHE_ROOT) as it:
+            stale = [entry.path for entry in it
+                     if entry.name.startswith("run-") and entry.is_dir() and entry.stat().st_mtime < cutoff]
+    except OSError:
+        return
+    for path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+
+def _store_cached_stl(temp_stl: str, cache_path: str, logs: str) -> None:
+    """
+    Moves a freshly exported STL into the cache and prunes old entries.
+    """
+    try:
+        os.makedirs(_STL_CACHE_DIR, exist_ok=True)
+        shutil.move(temp_stl, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache STL: {e}")
+        return
+
+    # The STL lands first; export_stl only reuses it once its log exists
+    try:
+        with open(cache_path + ".log", "w", encoding="utf-8") as f:
+            f.write(logs)
+    except OSError as e:
+        logger.warning(f"Could not cache STL log: {e}")
+        _remove_cache_file(cache_path)
+        return
+    _prune_stl_cache()
+
+def _remove_cache_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove cached STL {path}: {e}")
+
+def _prune_stl_cache(keep: int = _STL_CACHE_SIZE) -> None:
+    """
+    Keeps only the `keep` most recently written cached STLs,
+    and removes .log files whose STL is gone.
+    """
+    try:
+        with os.scandir(_STL_CACHE_DIR) as it:
+            entries = list(it)
+        stls = [entry for entry in entries if entry.name.endswith(".stl")]
+        stls.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+
+    kept = {entry.name for entry in stls[:keep]}
+    for entry in stls[keep:]:
+        _remove_cache_file(entry.path)
+    for entry in entries:
+        if entry.name.endswith(".stl.log") and entry.name[:-len(".log")] not in kept:
+            _remove_cache_file(entry.path)
+
+def invalidate_stl_cache() -> None:
+    """
+    Drops all cached STLs. As with previews, an edit to an included file
+    doesn't change the includer's mtime.
+    """
+    _prune_stl_cache(keep=0)
+
+def _load_label_font():
+    """
+    Picks the font used for view labels in the matrix image.
+    Falls back to PIL's built-in font if no TrueType candidate loads.
+    """
+    font_paths = [
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+        "/usr/share/fonts/truetype/freefont/FreeSansBold.ttf"
+    ]
+    for fp in font_paths:
+        if os.path.exists(fp):
+            try:
+                return ImageFont.truetype(fp, 14)
+            except IOError:
+                continue
+
+    return ImageFont.load_default()
+
+# Loaded once, reused by every render_views_matrix call
+_LABEL_FONT = _load_label_font()
+
+# Views rendered by render_views_matrix, in layout order: (name, rot_x, rot_y, rot_z)
+_VIEWS = (
+    # Orthogonal views
+    ("Top", 0, 0, 0),
+    ("Bottom", 180, 0, 0),
+    ("Front", 90, 0, 0),
+    ("Back", 90, 0, 180),    # 90 around X (Front), then 180 around Z to look from back upright
+    ("Left", 90, 0, 270),    # 90 around X (Front), then 270 around Z (or -90) to look from Left
+    ("Right", 90, 0, 90),    # 90 around X (Front), then 90 around Z to look from Right
+
+    # Top Isometrics
+    ("Iso TFR", 60, 0, 45),   # Top-Front-Right
+    ("Iso TFL", 60, 0, 315),  # Top-Front-Left
+    ("Iso TBR", 60, 0, 135),  # Top-Back-Right
+    ("Iso TBL", 60, 0, 225),  # Top-Back-Left
+
+    # Bottom Isometries
+    ("Iso BFR", 120, 0, 45),  # Bottom-Front-Right
+    ("Iso BFL", 120, 0, 315), # Bottom-Front-Left
+    ("Iso BBR", 120, 0, 135), # Bottom-Back-Right
+    ("Iso BBL", 120, 0, 225)  # Bottom-Back-Left
+)
+
+# Map short names to long descriptions for labels
+_VIEW_LABELS = {
+    "Iso TFR": "Isometric - Top-Front-Right",
+    "Iso TFL": "Isometric - Top-Front-Left",
+    "Iso TBR": "Isometric - Top-Back-Right",
+    "Iso TBL": "Isometric - Top-Back-Left",
+    "Iso BFR": "Isometric - Bottom-Front-Right",
+    "Iso BFL": "Isometric - Bottom-Front-Left",
+    "Iso BBR": "Isometric - Bottom-Back-Right",
+    "Iso BBL": "Isometric - Bottom-Back-Left"
+}
+
+# Start from an empty per-process STL cache and drop it again at exit
+_cleanup_stale_stl_caches()
+atexit.register(_remove_stl_cache_dir)
+
+def _read_summary_bounds(summary_file: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Reads the bounding box from an OpenSCAD --summary JSON file.
+    Returns (mins, maxs), or None if the file is missing or has no 3D bounds.
+    """
+    try:
+        with open(summary_file, "r", encoding="utf-8") as f:
+            bbox = json.load(f)["geometry"]["bounding_box"]
+        mins = np.array(bbox["min"], dtype=float)
+        maxs = np.array(bbox["max"], dtype=float)
+        if mins.shape != (3,) or maxs.shape != (3,):
+            return None
+        return mins, maxs
+    except Exception:
+        return None
+
+# Camera used when the model bounds can't be determined: (center_x, center_y, center_z, distance)
+_DEFAULT_CAMERA = (0, 0, 0, 500)
+
+class _CameraParametersUnavailable(Exception):
+    """
+    Raised out of _camera_cached so lru_cache doesn't remember failed calculations.
+    """
+
+def _calculate_camera_parameters_impl(scad_filename: str) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Uncached body of calculate_camera_parameters.
+    Returns None if the export fails or the bounds can't be determined.
     """
     with tempfile.NamedTemporaryFile(suffix=".stl", delete=False) as tmp:
         temp_stl = tmp.name
+    summary_file = os.path.splitext(temp_stl)[0] + ".json"
+    use_summary = runner.supports_option("--summary")
+
+    # Taken before rendering so a concurrent edit can't be cached under the new mtime
+    stl_cache_path = _stl_cache_path(scad_filename)
+    success = False
+    stderr = ""
 
     try:
         # Export to STL to get geometry bounds
-        success, stdout, stderr = runner.run(["-o", temp_stl, scad_filename])
+        args = ["-o", temp_stl, scad_filename]
+        if use_summary:
+            # Let OpenSCAD report the bounds so the STL doesn't have to be parsed
+            args = ["--summary", "bounding-box", "--summary-file", summary_file] + args
+
+        success, stdout, stderr = runner.run(args)
         if not success:
             logger.error(f"Failed to export STL for calculation: {stderr}")
-            # Fallback to defaults
-            return 0, 0, 0, 500
+            return None
 
-        # Load mesh
-        try:
-            your_mesh = mesh.Mesh.from_file(temp_stl)
+        bounds = _read_summary_bounds(summary_file) if use_summary else None
 
-            if your_mesh.points.size == 0:
-                 return 0, 0, 0, 500
+        try:
+            if bounds is not None:
+                mins, maxs = bounds
+            else:
+                # Load mesh
+                your_mesh = mesh.Mesh.from_file(temp_stl)
 
-            minx = your_mesh.x.min()
-            maxx = your_mesh.x.max()
-            miny = your_mesh.y.min()
-            maxy = your_mesh.y.max()
-            minz = your_mesh.z.min()
-            maxz = your_mesh.z.max()
+                if your_mesh.points.size == 0:
+                     return None
 
-            cx = (minx + maxx) / 2
-            cy = (miny + maxy) / 2
-            cz = (minz + maxz) / 2
+                # points is (N, 9): three xyz vertices per triangle. View it as (3N, 3)
+                # so both bounds come from one reduction per direction instead of six.
+                pts = your_mesh.points.reshape(-1, 3)
+                mins = pts.min(axis=0)
+                maxs = pts.max(axis=0)
 
-            width = maxx - minx
-            depth = maxy - miny
-            height = maxz - minz
+            cx, cy, cz = (mins + maxs) * 0.5
 
             # Heuristic for distance:
             # We want the object to fit.
             # Diagonal is a safe approximation for the bounding sphere diameter.
-            diagonal = math.sqrt(width**2 + depth**2 + height**2)
+            diagonal = float(np.linalg.norm(maxs - mins))
 
             # If diagonal is 0 (empty or single point), default to 100
             if diagonal == 0:
@@ -82,11 +332,45 @@ def calculate_camera_parameters(scad_filename: str) -> Tuple[float, float, float
 
         except Exception as e:
             logger.error(f"Error analyzing STL: {e}")
-            return 0, 0, 0, 500
+            return None
 
     finally:
-        if os.path.exists(temp_stl):
-            os.remove(temp_stl)
+        if success and stl_cache_path:
+            _store_cached_stl(temp_stl, stl_cache_path, stderr)
+
+        for temp_file in (temp_stl, summary_file):
+            try:
+                os.remove(temp_file)
+            except FileNotFoundError:
+                pass
+
+@functools.lru_cache(maxsize=64)
+def _camera_cached(abs_path: str, mtime_ns: int) -> Tuple[float, float, float, float]:
+    # mtime_ns is only part of the key, so an edited file gets a fresh entry
+    params = _calculate_camera_parameters_impl(abs_path)
+    if params is None:
+        raise _CameraParametersUnavailable(abs_path)
+    return params
+
+def calculate_camera_parameters(scad_filename: str) -> Tuple[float, float, float, float]:
+    """
+    Calculates the center of the model and an optimal camera distance
+    from its bounding box. The bounds come from OpenSCAD's --summary output
+    when supported, otherwise from parsing an exported STL.
+    Results are cached per file and modification time.
+    Returns (center_x, center_y, center_z, distance).
+    """
+    try:
+        mtime_ns = os.stat(scad_filename).st_mtime_ns
+    except OSError:
+        params = _calculate_camera_parameters_impl(scad_filename)
+        return params if params is not None else _DEFAULT_CAMERA
+
+    try:
+        return _camera_cached(os.path.abspath(scad_filename), mtime_ns)
+    except _CameraParametersUnavailable:
+        # Fallback to defaults
+        return _DEFAULT_CAMERA
 
 @mcp.tool()
 def write_scad_script(filename: str, content: str) -> str:
@@ -110,16 +394,22 @@ def write_scad_script(filename: str, content: str) -> str:
     if ".." in filename or os.path.isabs(filename):
         # Allow absolute paths ONLY if they are inside the CWD
         try:
-            cwd = os.getcwd()
-            abs_path = os.path.abspath(filename)
-            if os.path.commonpath([cwd, abs_path]) != cwd:
-                 return "Error: Cannot save files outside the current working directory."
+            abs_path = os.path.normcase(os.path.abspath(filename))
         except:
              return "Error: Invalid filename."
+        if abs_path != _CWD and not abs_path.startswith(_CWD_PREFIX):
+             return "Error: Cannot save files outside the current working directory."
 
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Encode once and write raw bytes, bypassing the TextIOWrapper buffer
+        with open(filename, "wb") as f:
+            f.write(content.encode("utf-8"))
+        # Drop cached library lookups (the CWD may overlap a library directory) and renders
+        runner.invalidate_library_cache()
+        invalidate_render_cache()
+        # Included files don't change the includer's mtime, so drop cached camera parameters and STLs too
+        _camera_cached.cache_clear()
+        invalidate_stl_cache()
         return f"Successfully saved {filename}. NOW call `render_preview` to check your work."
     except Exception as e:
         return f"Error saving file: {str(e)}"
@@ -139,12 +429,11 @@ def read_scad_script(filename: str) -> str:
     if not filename.endswith(".scad"):
         filename += ".scad"
 
-    if not os.path.exists(filename):
-        return f"Error: File {filename} does not exist in working directory."
-
     try:
         with open(filename, "r", encoding="utf-8") as f:
             return f.read()
+    except FileNotFoundError:
+        return f"Error: File {filename} does not exist in working directory."
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
@@ -167,6 +456,9 @@ def read_scad_library_file(filepath: str) -> str:
     try:
         with open(resolved_path, "r", encoding="utf-8") as f:
             return f.read()
+    except FileNotFoundError:
+        # Resolutions are cached, so the file may have been removed since
+        return f"Error: File '{filepath}' not found in any allowed library path or access denied."
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
@@ -186,31 +478,36 @@ def list_scad_library_directory(dirpath: str) -> str:
     if not resolved_path:
          return f"Error: Directory '{dirpath}' not found in any allowed library path or access denied."
 
-    if not os.path.exists(resolved_path):
-        return f"Error: Directory '{resolved_path}' does not exist."
-
     try:
-        result = f"Contents of {dirpath} ({resolved_path}):\n"
-        for item in os.listdir(resolved_path):
-            item_path = os.path.join(resolved_path, item)
-            if os.path.isdir(item_path):
-                result += f"  [DIR]  {item}\n"
-            elif item.endswith(".scad") or item.endswith(".inc"):
-                result += f"  [FILE] {item}\n"
-            else:
-                result += f"  [OTHER] {item}\n"
-        return result
+        parts = [f"Contents of {dirpath} ({resolved_path}):\n"]
+        # scandir reuses the file type from the directory read, avoiding a stat() per entry
+        with os.scandir(resolved_path) as it:
+            for entry in it:
+                if entry.is_dir():
+                    parts.append(f"  [DIR]  {entry.name}\n")
+                elif entry.name.endswith(_SCAD_EXTS):
+                    parts.append(f"  [FILE] {entry.name}\n")
+                else:
+                    parts.append(f"  [OTHER] {entry.name}\n")
+        return "".join(parts)
+    except FileNotFoundError:
+        return f"Error: Directory '{resolved_path}' does not exist."
+    except NotADirectoryError:
+        return f"Error: '{resolved_path}' is not a directory."
     except Exception as e:
         return f"Error reading directory: {str(e)}"
 
 @mcp.tool()
 def render_preview(scad_filename: str, output_filename: str = "preview.png",
                    rotation_x: Optional[float] = None, rotation_y: Optional[float] = None,
-                   rotation_z: Optional[float] = None, distance: Optional[float] = None) -> list:
+                   rotation_z: Optional[float] = None, distance: Optional[float] = None,
+                   full_render: bool = False) -> list:
     """
     Renders a PNG preview of the OpenSCAD file and returns it visually.
     Optionally allows specifying rotation and distance.
     Automatically calculates object center and optimal distance if not provided.
+    Uses the fast OpenGL preview at 512x512 unless full_render is set,
+    which renders the CGAL geometry at OpenSCAD's default image size.
 
     Args:
         scad_filename: The .scad file to render.
@@ -219,6 +516,8 @@ def render_preview(scad_filename: str, output_filename: str = "preview.png",
         rotation_y: Rotation around Y axis (degrees).
         rotation_z: Rotation around Z axis (degrees).
         distance: Camera distance. If None, it will be calculated automatically.
+        full_render: If True, render the final CGAL geometry instead of the fast preview
+            (slower, but shows exactly what will be exported).
 
     Returns:
         A list containing the success message/logs and the Image resource.
@@ -229,7 +528,17 @@ def render_preview(scad_filename: str, output_filename: str = "preview.png",
     if not os.path.exists(scad_filename):
         return [f"Error: File {scad_filename} does not exist."]
 
-    args = ["-o", output_filename]
+    # Stream the PNG through stdout so it doesn't have to be read back from disk.
+    # Releases before 2021.01 lack --export-format and stdout export, so they write the file directly.
+    stream = runner.supports_option("--export-format")
+    args = ["-o", "-", "--export-format", "png"] if stream else ["-o", output_filename]
+
+    # OpenCSG preview skips the CGAL evaluation entirely. throwntogether would be
+    # cheaper still, but it draws subtracted volumes instead of cutting them out.
+    if full_render:
+        args.append("--render")
+    else:
+        args += ["--preview", "--imgsize=512,512"]
 
     # Check if we need to set camera manually
     has_rotation = any(v is not None for v in [rotation_x, rotation_y, rotation_z])
@@ -250,7 +559,46 @@ def render_preview(scad_filename: str, output_filename: str = "preview.png",
 
     args.append(scad_filename)
 
-    success, stdout, stderr = runner.run(args)
+    # Identical source and camera -> reuse the previous render
+    try:
+        cache_key = _render_cache_key(scad_filename, args)
+    except OSError:
+        cache_key = None
+
+    with _RENDER_CACHE_LOCK:
+        cached = _RENDER_CACHE.get(cache_key) if cache_key else None
+        if cached:
+            _RENDER_CACHE.move_to_end(cache_key)
+
+    # Set when OpenSCAD itself wrote output_filename
+    file_written = False
+
+    if cached:
+        success = True
+        img_data, stderr = cached
+    else:
+        if stream:
+            success, img_data, stderr = runner.run(args, stdout_binary=True)
+        else:
+            success, stdout, stderr = runner.run(args)
+            img_data = b""
+            if success:
+                file_written = True
+                try:
+                    with open(output_filename, "rb") as f:
+                        img_data = f.read()
+                except Exception as e:
+                    stderr += f"\nCould not read generated image file: {e}"
+
+        if success and not img_data:
+            success = False
+            stderr += "\nOpenSCAD did not produce any image data."
+
+        if success and cache_key:
+            with _RENDER_CACHE_LOCK:
+                _RENDER_CACHE[cache_key] = (img_data, stderr)
+                if len(_RENDER_CACHE) > _RENDER_CACHE_SIZE:
+                    _RENDER_CACHE.popitem(last=False)
 
     result = []
     if success:
@@ -258,12 +606,15 @@ def render_preview(scad_filename: str, output_filename: str = "preview.png",
         result.append(message)
 
         # Add the image resource
-        try:
-            with open(output_filename, "rb") as f:
-                img_data = f.read()
-                result.append(Image(data=img_data, format="png"))
-        except Exception as e:
-            result.append(f"Warning: Could not read generated image file: {e}")
+        result.append(Image(data=img_data, format="png"))
+
+        # Keep the on-disk copy for the user
+        if not file_written:
+            try:
+                with open(output_filename, "wb") as f:
+                    f.write(img_data)
+            except Exception as e:
+                result.append(f"Warning: Could not save image file: {e}")
 
         return result
     else:
@@ -274,12 +625,14 @@ def render_views_matrix(scad_filename: str, output_filename: str = "views_matrix
     """
     Renders a set of views (Top, Bottom, Front, Back, Left, Right, Isometric)
     and combines them into a single matrix image with labels.
-    Automatically centers the object and calculates distance if not provided.
+    If distance is omitted, the object is automatically centered and the distance calculated.
 
     Args:
         scad_filename: The .scad file to render.
         output_filename: The final combined image filename.
-        distance: Camera distance for all views. If None, calculated automatically.
+        distance: Camera distance for all views. If None, calculated automatically
+            (with auto-centering). If set, the camera targets the origin instead,
+            which skips the extra geometry export used for auto-centering.
 
     Returns:
         A list containing the success message and the Image resource.
@@ -290,57 +643,43 @@ def render_views_matrix(scad_filename: str, output_filename: str = "views_matrix
     if not os.path.exists(scad_filename):
         return [f"Error: File {scad_filename} does not exist."]
 
-    # Calculate center and distance
-    cx, cy, cz, calc_dist = calculate_camera_parameters(scad_filename)
-    dist = distance if distance is not None else calc_dist
-
-    # Define views: Name -> (rot_x, rot_y, rot_z)
-    views = {
-        # Orthogonal views
-        "Top": (0, 0, 0),
-        "Bottom": (180, 0, 0),
-        "Front": (90, 0, 0),
-        "Back": (90, 0, 180), # 90 around X (Front), then 180 around Z to look from back upright
-        "Left": (90, 0, 270), # 90 around X (Front), then 270 around Z (or -90) to look from Left
-        "Right": (90, 0, 90), # 90 around X (Front), then 90 around Z to look from Right
-
-        # Top Isometrics
-        "Iso TFR": (60, 0, 45),   # Top-Front-Right
-        "Iso TFL": (60, 0, 315),  # Top-Front-Left
-        "Iso TBR": (60, 0, 135),  # Top-Back-Right
-        "Iso TBL": (60, 0, 225),  # Top-Back-Left
-
-        # Bottom Isometries
-        "Iso BFR": (120, 0, 45),  # Bottom-Front-Right
-        "Iso BFL": (120, 0, 315), # Bottom-Front-Left
-        "Iso BBR": (120, 0, 135), # Bottom-Back-Right
-        "Iso BBL": (120, 0, 225)  # Bottom-Back-Left
-    }
-
-    # Map short names to long descriptions for labels
-    labels_map = {
-        "Iso TFR": "Isometric - Top-Front-Right",
-        "Iso TFL": "Isometric - Top-Front-Left",
-        "Iso TBR": "Isometric - Top-Back-Right",
-        "Iso TBL": "Isometric - Top-Back-Left",
-        "Iso BFR": "Isometric - Bottom-Front-Right",
-        "Iso BFL": "Isometric - Bottom-Front-Left",
-        "Iso BBR": "Isometric - Bottom-Back-Right",
-        "Iso BBL": "Isometric - Bottom-Back-Left"
-    }
+    # An explicit distance means the caller knows the model size; skip the bounds export
+    if distance is not None:
+        cx = cy = cz = 0.0
+        dist = distance
+    else:
+        cx, cy, cz, dist = calculate_camera_parameters(scad_filename)
 
     generated_images = []
 
     try:
-        # Create a temporary directory to store individual view images
-        with tempfile.TemporaryDirectory() as temp_dir:
-            for name, (rx, ry, rz) in views.items():
+        # Create a temporary directory to store individual view images (on tmpfs if available)
+        with tempfile.TemporaryDirectory(dir=_FAST_TEMP_DIR) as temp_dir:
+            # Submit all views to the render pool, each with its own output file
+            jobs = []
+
+            # Center and distance are the same for every view, only the rotation varies
+            cam_prefix = f"--camera={cx},{cy},{cz},"
+            cam_suffix = f",{dist}"
+
+            for name, rx, ry, rz in _VIEWS:
                 temp_out = os.path.join(temp_dir, f"{name.replace(' ', '_')}.png")
 
-                # Use calculated center and distance
-                camera_arg = f"--camera={cx},{cy},{cz},{rx},{ry},{rz},{dist}"
+                camera_arg = f"{cam_prefix}{rx},{ry},{rz}{cam_suffix}"
+
+                future = _RENDER_POOL.submit(runner.run, ["-o", temp_out, camera_arg, scad_filename])
+
+                # Format the label while the render is in flight
+                # Use long label if available, otherwise just name
+                display_name = _VIEW_LABELS.get(name, name)
+                label = f"{display_name} (Rot: {rx},{ry},{rz} Dist: {dist:.1f})"
 
-                success, stdout, stderr = runner.run(["-o", temp_out, camera_arg, scad_filename])
+                jobs.append((name, label, temp_out, future))
+
+            wait([job[-1] for job in jobs])
+
+            for name, label, temp_out, future in jobs:
+                success, stdout, stderr = future.result()
 
                 if not success:
                     logger.error(f"Failed to render view {name}: {stderr}")
@@ -348,9 +687,9 @@ def render_views_matrix(scad_filename: str, output_filename: str = "views_matrix
 
                 try:
                     # We need to copy or load the image into memory because temp_dir will be deleted
-                    img = PILImage.open(temp_out)
-                    img.load() # Force loading into memory
-                    generated_images.append((name, img, rx, ry, rz))
+                    # convert() forces loading and gives plain RGB tiles for the numpy blit below
+                    img = PILImage.open(temp_out).convert("RGB")
+                    generated_images.append((name, img, label))
                 except Exception as e:
                     return [f"Error processing image for view {name}: {str(e)}"]
 
@@ -386,28 +725,11 @@ def render_views_matrix(scad_filename: str, output_filename: str = "views_matrix
             matrix_w = cols * cell_w + margin
             matrix_h = rows * cell_h + margin
 
-            matrix_img = PILImage.new('RGB', (matrix_w, matrix_h), color=(255, 255, 255))
-            draw = ImageDraw.Draw(matrix_img)
+            # Blit all views into one preallocated canvas, then draw frames and labels on top
+            canvas = np.full((matrix_h, matrix_w, 3), 255, dtype=np.uint8)
+            cells = []
 
-            # Load font
-            font_paths = [
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-                "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
-                "/usr/share/fonts/truetype/freefont/FreeSansBold.ttf"
-            ]
-            font = None
-            for fp in font_paths:
-                if os.path.exists(fp):
-                    try:
-                        font = ImageFont.truetype(fp, 14)
-                        break
-                    except IOError:
-                        continue
-
-            if font is None:
-                font = ImageFont.load_default()
-
-            for idx, (name, img, rx, ry, rz) in enumerate(generated_images):
+            for idx, (name, img, label) in enumerate(generated_images):
                 col = idx % cols
                 row = idx // cols
 
@@ -415,6 +737,20 @@ def render_views_matrix(scad_filename: str, output_filename: str = "views_matrix
                 cell_x = margin + col * cell_w
                 cell_y = margin + row * cell_h
 
+                # Paste Image
+                # Inside frame: padding -> Text (label_height) -> Image
+                img_x = cell_x + padding
+                img_y = cell_y + padding + label_height
+                canvas[img_y:img_y + img_h, img_x:img_x + img_w] = np.asarray(img)
+
+                cells.append((cell_x, cell_y, label))
+
+            matrix_img = PILImage.fromarray(canvas)
+            draw = ImageDraw.Draw(matrix_img)
+
+            font = _LABEL_FONT
+
+            for cell_x, cell_y, label in cells:
                 # Draw Frame (Rectangle)
                 # Coordinates: (left, top, right, bottom)
                 # Right and Bottom are inclusive in some APIs, usually x+w-1.
@@ -427,32 +763,25 @@ def render_views_matrix(scad_filename: str, output_filename: str = "views_matrix
                     width=1
                 )
 
-                # Paste Image
-                # Inside frame: padding -> Text (label_height) -> Image
-                img_x = cell_x + padding
-                img_y = cell_y + padding + label_height
-                matrix_img.paste(img, (img_x, img_y))
-
                 # Draw Label
                 text_x = cell_x + padding + 5
-                text_y = cell_x + padding + 5 # Typo in original code? No, let's fix.
-                # Actually, text_y should be relative to cell_y
                 text_y = cell_y + padding + 2
 
-                # Use long label if available, otherwise just name
-                display_name = labels_map.get(name, name)
-                label = f"{display_name} (Rot: {rx},{ry},{rz} Dist: {dist:.1f})"
                 draw.text((text_x, text_y), label, fill=(0, 0, 0), font=font)
 
-            matrix_img.save(output_filename)
+            # Encode once in memory; the same bytes go to disk and to the client.
+            # Low zlib effort: compression dominates encode time and barely shrinks renders.
+            buf = io.BytesIO()
+            matrix_img.save(buf, format="PNG", compress_level=1)
+            img_data = buf.getvalue()
+
+            with open(output_filename, "wb") as f:
+                f.write(img_data)
 
             result = []
             message = f"Successfully generated views matrix: {output_filename}"
             result.append(message)
-
-            with open(output_filename, "rb") as f:
-                img_data = f.read()
-                result.append(Image(data=img_data, format="png"))
+            result.append(Image(data=img_data, format="png"))
 
             return result
 
@@ -478,6 +807,19 @@ def export_stl(scad_filename: str, output_filename: str = "model.stl") -> str:
     if not os.path.exists(scad_filename):
         return f"Error: File {scad_filename} does not exist."
 
+    # Reuse the STL left by a previous camera calculation on this exact file version
+    cache_path = _stl_cache_path(scad_filename)
+    if cache_path and output_filename.lower().endswith(".stl"):
+        try:
+            with open(cache_path + ".log", "r", encoding="utf-8") as f:
+                cached_logs = f.read()
+            shutil.copyfile(cache_path, output_filename)
+            return f"Successfully exported {output_filename}.\nLogs:\n{cached_logs}"
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not reuse cached STL: {e}")
+
     success, stdout, stderr = runner.run(["-o", output_filename, scad_filename])
 
     if success:
@@ -497,21 +839,37 @@ def list_libraries() -> str:
     if not paths:
         return "No standard library paths found."
 
-    result = "Found libraries in:\n"
+    parts = ["Found libraries in:\n"]
 
     for path in paths:
-        result += f"\nPath: {path}\n"
+        parts.append(f"\nPath: {path}\n")
         try:
-            for item in os.listdir(path):
-                item_path = os.path.join(path, item)
-                if os.path.isdir(item_path):
-                    result += f"  [DIR]  {item}\n"
-                elif item.endswith(".scad"):
-                    result += f"  [FILE] {item}\n"
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        parts.append(f"  [DIR]  {entry.name}\n")
+                    elif entry.name.endswith(".scad"):
+                        parts.append(f"  [FILE] {entry.name}\n")
         except Exception as e:
-            result += f"  Error reading directory: {e}\n"
+            parts.append(f"  Error reading directory: {e}\n")
 
-    return result
+    return "".join(parts)
+
+def _warmup() -> None:
+    """
+    Runs a throwaway render so OpenSCAD's first-run initialization
+    happens before the first real request.
+    """
+    try:
+        with tempfile.TemporaryDirectory(dir=_FAST_TEMP_DIR) as temp_dir:
+            temp_scad = os.path.join(temp_dir, "warmup.scad")
+            with open(temp_scad, "w", encoding="utf-8") as f:
+                f.write("cube(1);\n")
+            runner.run(["-o", os.path.join(temp_dir, "warmup.png"), temp_scad])
+    except Exception as e:
+        logger.debug(f"Warm-up render failed: {e}")
 
 if __name__ == "__main__":
+    if runner.executable:
+        threading.Thread(target=_warmup, daemon=True).start()
     mcp.run()